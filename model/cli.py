@@ -0,0 +1,200 @@
+"""
+Command line entry point; run `python -m model --help` for usage.
+
+Only the standard library and the stdlib-only work_queue module are imported at startup. SETTINGS and the scraping
+stack (pandas, bs4, tqdm, validators, requests) are imported inside the commands which need them, so `--help`, `status`
+and `--dry-run` stay fast enough for cron jobs firing many short invocations per hour.
+"""
+import argparse
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from model.modules.snapshots import basket_output_name
+from model.modules.work_queue import PAGINATED_CATEGORIES, queue_path_from_settings, read_queue_counts
+
+logger = logging.getLogger(__name__)
+
+
+def _settings():
+    import SETTINGS
+
+    return SETTINGS
+
+
+def _configure_logging(settings):
+    import logging.config
+    import warnings
+
+    warnings.filterwarnings("ignore")
+    logging.config.dictConfig(settings.LOGGING_CONFIG)
+
+
+def _lookup(options: Dict, names: List[str], kind: str) -> Dict:
+    unknown = [name for name in names if name not in options]
+    if unknown:
+        raise SystemExit(f"Unknown {kind}: {', '.join(unknown)}. Available: {', '.join(options)}.")
+    return {name: options[name] for name in names}
+
+
+def _paginated(categories: Dict) -> Dict:
+    # CategoryReader.generate_category_urls would scrape graphic cards pages for any other category.
+    for category_name in categories:
+        if category_name not in PAGINATED_CATEGORIES:
+            raise SystemExit(
+                f"Pagination of {category_name} category is unknown; supported: {PAGINATED_CATEGORIES}."
+            )
+    return categories
+
+
+def scrape_baskets(baskets_lookup: Dict, output_folder: Path, dry_run: bool = False, scoped: bool = False):
+    """
+    Scrapes baskets into a single `product_set` pickle or, for a scoped run, into a `basket_<name>` pickle per basket,
+    so that a run of some baskets never replaces the newest full product set.
+    """
+    if dry_run:
+        for basket_name, product_urls in baskets_lookup.items():
+            output_name = basket_output_name(basket_name) if scoped else 'product_set'
+            print(f"basket {basket_name}: {len(product_urls)} product pages -> {output_folder}/{output_name}")
+        return
+    from model.modules.scrapers import BasketScraper, MultipleBasketsScraper
+
+    logger.info(f"Commencing scraping of {len(baskets_lookup)} Ceneo product sets.")
+    if not scoped:
+        MultipleBasketsScraper(baskets_lookup=baskets_lookup, output_folder=output_folder).run()
+        return
+    for basket_name, product_urls in baskets_lookup.items():
+        basket_scraper = BasketScraper(basket_name=basket_name, product_urls=product_urls, output_folder=output_folder)
+        basket_scraper.run()
+        basket_scraper.save_result_df()
+
+
+def scrape_categories(categories: Dict, output_folder: Path, dry_run: bool = False):
+    if dry_run:
+        for category_name, url in categories.items():
+            print(f"category {category_name}: {url} -> {output_folder}")
+        return
+    from model.modules.scrapers import CategoryScraper
+
+    logger.info(f"Commencing scraping of {len(categories)} Ceneo categories.")
+    for category_name, url in categories.items():
+        CategoryScraper(url=url, category_name=category_name, output_folder=output_folder).run()
+
+
+def scrape_summaries(urls: List[str], output_folder: Path, dry_run: bool = False):
+    # Saved apart from `product_set`, whose newest pickle is expected to hold every basket of SETTINGS.
+    if dry_run:
+        for url in urls:
+            print(f"summary {url} -> {output_folder}/summary")
+        return
+    from model.modules.scrapers import ProductSetScraper
+
+    logger.info(f"Commencing scraping of {len(urls)} Ceneo summaries.")
+    ProductSetScraper(ceneo_summaries=urls, output_folder=output_folder, output_name='summary').run()
+
+
+def basket_command(args):
+    settings = _settings()
+    baskets_lookup = settings.BASKETS_LOOKUP if args.all else _lookup(settings.BASKETS_LOOKUP, args.names, 'basket')
+    if not args.dry_run:
+        _configure_logging(settings)
+    scrape_baskets(
+        baskets_lookup,
+        output_folder=settings.PRODUCT_SET_OUTPUT_FOLDER,
+        dry_run=args.dry_run,
+        scoped=not args.all,
+    )
+
+
+def category_command(args):
+    settings = _settings()
+    categories = _paginated(_lookup(settings.CATEGORIES, args.names, 'category'))
+    if not args.dry_run:
+        _configure_logging(settings)
+    scrape_categories(categories, output_folder=settings.CATEGORIES_OUTPUT_FOLDER, dry_run=args.dry_run)
+
+
+def summary_command(args):
+    settings = _settings()
+    if not args.dry_run:
+        _configure_logging(settings)
+    scrape_summaries(args.urls, output_folder=settings.PRODUCT_SET_OUTPUT_FOLDER, dry_run=args.dry_run)
+
+
+def all_command(args):
+    settings = _settings()
+    categories = _paginated(_lookup(settings.CATEGORIES, args.categories, 'category'))
+    if not args.dry_run:
+        _configure_logging(settings)
+    scrape_baskets(settings.BASKETS_LOOKUP, output_folder=settings.PRODUCT_SET_OUTPUT_FOLDER, dry_run=args.dry_run)
+    scrape_categories(categories, output_folder=settings.CATEGORIES_OUTPUT_FOLDER, dry_run=args.dry_run)
+
+
+def status_command(args):
+    """
+    Prints the newest result of every scraper output and, if there is one, the state of the work queue. Reads only
+    file names and the queue file, never the pickled results.
+    """
+    from model.modules.snapshots import find_latest_snapshots
+
+    settings = _settings()
+    folders = args.folders or [settings.PRODUCT_SET_OUTPUT_FOLDER, settings.CATEGORIES_OUTPUT_FOLDER]
+    latest = find_latest_snapshots(folders)
+    if not latest:
+        print(f"No results in {', '.join(str(folder) for folder in folders)}.")
+    now = datetime.now()
+    for source, (timestamp, path) in sorted(latest.items()):
+        age = now - datetime.strptime(timestamp, '%Y_%m_%d_%H_%M_%S')
+        print(f"{source}: {path.name} ({int(age.total_seconds() // 60)} min ago)")
+
+    queue_path = queue_path_from_settings(settings)
+    if queue_path.exists():
+        counts = read_queue_counts(queue_path)
+        print(f"queue {queue_path}: " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+
+
+def make_parser() -> argparse.ArgumentParser:
+    dry_run_help = "print what would be scraped without scraping"
+    parser = argparse.ArgumentParser(prog='python -m model', description="Ceneo price tracker.")
+    parser.add_argument('--dry-run', action='store_true', help=dry_run_help)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    # Lets scraping commands take --dry-run after the command too; SUPPRESS keeps them from resetting the top-level flag.
+    scraping = argparse.ArgumentParser(add_help=False)
+    scraping.add_argument('--dry-run', action='store_true', default=argparse.SUPPRESS, help=dry_run_help)
+
+    basket = subparsers.add_parser('basket', parents=[scraping], help="scrape baskets from SETTINGS.BASKETS_LOOKUP")
+    basket.add_argument('names', nargs='*', help="basket names")
+    basket.add_argument('--all', action='store_true', help="scrape every basket")
+    basket.set_defaults(func=basket_command)
+
+    category = subparsers.add_parser('category', parents=[scraping], help="scrape categories from SETTINGS.CATEGORIES")
+    category.add_argument('names', nargs='+', help="category names")
+    category.set_defaults(func=category_command)
+
+    summary = subparsers.add_parser('summary', parents=[scraping], help="scrape Ceneo summary pages")
+    summary.add_argument('urls', nargs='+', help="summary urls")
+    summary.set_defaults(func=summary_command)
+
+    everything = subparsers.add_parser(
+        'all', parents=[scraping], help="scrape every basket and the categories with known pagination"
+    )
+    everything.add_argument('--categories', nargs='+', default=PAGINATED_CATEGORIES, help="category names")
+    everything.set_defaults(func=all_command)
+
+    status = subparsers.add_parser('status', help="show the newest results and the work queue state")
+    status.add_argument('--folders', nargs='+', type=Path, help="output folders to check")
+    status.set_defaults(func=status_command)
+    return parser
+
+
+def main(argv: List[str] = None):
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'basket' and not (args.names or args.all):
+        parser.error("give basket names or --all")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
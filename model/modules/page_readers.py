@@ -178,6 +178,22 @@ class CategoryReader(BaseReader):
         df["timestamp"] = self.timestamp
         return df
 
+    def read_page(self, url: str, title: str) -> pd.DataFrame:
+        """
+        Reads a single category page on its own, e.g. when pages are split between queue workers.
+        :param url: url of the category page.
+        :param title: category title, as read from the main category page.
+        :return: dataframe of the products on the page.
+        """
+        self.timestamp = datetime.now()
+        self.title = title
+        basket = Basket(name=title)
+        for part in self.read_products(url):
+            basket.add_product(part)
+        df = self.make_df(basket=basket)
+        self.df = self._enhance_df(df=df)
+        return self.df
+
     def read(self):
         # Staging.
         self.main_page = self.parse_page(url=self.url)
@@ -0,0 +1,323 @@
+import logging
+import math
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from model.modules.snapshots import find_latest_snapshots
+
+logger = logging.getLogger(__name__)
+
+# Columns of a ProductSetReader summary which are not per-basket prices.
+SUMMARY_COLUMNS = {
+    'brand', 'category', 'part_id', 'n_opinions', 'cheapest-shop', 'most-expensive-shop', 'cheapest-price',
+    'most-expensive-price', 'timestamp', 'title', 'status',
+}
+# Workers save every category page on its own as `<category_name>_page_<n>`.
+CATEGORY_PAGE_SOURCE = re.compile(r"^(?P<category>.+)_page_\d+$")
+
+BASKET = 'basket'
+CATEGORY = 'category'
+
+
+def _clean(value):
+    """
+    Converts pandas/numpy scalars to plain JSON-serializable values.
+    """
+    if value is None:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _key(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+class PriceIndex:
+    """
+    Latest prices of every basket and category held in memory and indexed by basket name, part id, category and shop.
+
+    The same basket may come from several sources, e.g. the `product_set` pickle of run_scrapers.py and a worker's
+    `basket_<name>` pickle; the newest snapshot of a basket replaces the whole basket. A category comes either whole
+    (`<category_name>`) or page by page (`<category_name>_page_<n>`); a whole snapshot replaces everything older in the
+    category, a page snapshot replaces the older snapshot of the same page and any older records of its parts.
+    Snapshots are ordered by the timestamp in their file name, so the order they are loaded in doesn't matter.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.snapshot_files = {}
+        self.by_basket = {}
+        self.by_category = {}
+        self.by_part = {}
+        self.by_shop = {}
+        self.basket_totals = {}
+        # Timestamp of the newest snapshot covering a whole basket/category; anything older is outdated.
+        self._complete_since = {}
+        self._cheapest = {}
+
+    def records_from_df(self, df: pd.DataFrame, source: str, timestamp: str) -> List[Dict]:
+        """
+        Flattens a scraper result dataframe into one record per product offer.
+        :param df: dataframe saved by one of the scrapers.
+        :param source: name of the scraper output the dataframe comes from.
+        :param timestamp: timestamp of the snapshot, as in its file name.
+        """
+        if df is None or df.empty:
+            return []
+        if 'price' in df.columns:
+            rows = [(name, row.get('basket_name'), row) for name, row in df.iterrows()]
+            price_columns = None
+        else:
+            # ProductSetReader summary; every basket has its own price column.
+            rows = [(name, None, row) for name, row in df.iterrows()]
+            price_columns = [column for column in df.columns if column not in SUMMARY_COLUMNS]
+
+        records = []
+        for name, basket_name, row in rows:
+            if price_columns is None:
+                prices = [(_clean(basket_name), _clean(row.get('price')), _clean(row.get('shop_name')))]
+            else:
+                prices = [(column, _clean(row[column]), None) for column in price_columns]
+            for basket, price, shop_name in prices:
+                if price is None:
+                    continue
+                records.append(
+                    {
+                        'name': _clean(name),
+                        'price': float(price),
+                        'part_id': _clean(row.get('part_id')),
+                        'category': _clean(row.get('category')),
+                        'brand': _clean(row.get('brand')),
+                        'shop_name': shop_name,
+                        'basket_name': basket,
+                        'timestamp': _clean(row.get('timestamp')),
+                        'snapshot': timestamp,
+                        'source': source,
+                    }
+                )
+        return records
+
+    def _lookup(self, scope: str) -> Dict:
+        return self.by_basket if scope == BASKET else self.by_category
+
+    def _put(self, scope: str, name: str, part_key: str, record: Dict):
+        self._remove(scope, name, part_key)
+        self._lookup(scope).setdefault(name, {})[part_key] = record
+        if record['part_id'] is not None:
+            self.by_part.setdefault(_key(record['part_id']), {})[(scope, name)] = record
+        if record['shop_name'] is not None:
+            self.by_shop.setdefault(record['shop_name'], {})[(scope, name, part_key)] = record
+
+    def _remove(self, scope: str, name: str, part_key: str):
+        record = self._lookup(scope).get(name, {}).pop(part_key, None)
+        if record is None:
+            return
+        for lookup, key, entry in (
+            (self.by_part, _key(record['part_id']), (scope, name)),
+            (self.by_shop, record['shop_name'], (scope, name, part_key)),
+        ):
+            if key in lookup and lookup[key].get(entry) is record:
+                del lookup[key][entry]
+                if not lookup[key]:
+                    del lookup[key]
+
+    def _merge(self, scope: str, name: str, records: List[Dict], source: str, timestamp: str, complete: bool):
+        """
+        Merges records of a single basket or category from a snapshot taken at `timestamp`.
+        :param source: name of the scraper output the snapshot comes from.
+        :param complete: whether the snapshot holds the whole basket/category or only a part of it.
+        """
+        complete_since = self._complete_since.get((scope, name), '')
+        if timestamp < complete_since:
+            return
+        current = self._lookup(scope).setdefault(name, {})
+        if complete:
+            self._complete_since[(scope, name)] = timestamp
+            outdated = [part_key for part_key, record in current.items() if record['snapshot'] < timestamp]
+        else:
+            # A newer snapshot of the same page replaces that page; parts which left it are dropped.
+            outdated = [
+                part_key
+                for part_key, record in current.items()
+                if record['source'] == source and record['snapshot'] < timestamp
+            ]
+        for part_key in outdated:
+            self._remove(scope, name, part_key)
+        for record in records:
+            part_key = _key(record['part_id']) or record['name']
+            existing = current.get(part_key)
+            if existing is None or existing['snapshot'] <= timestamp:
+                self._put(scope, name, part_key, record)
+        if not current:
+            del self._lookup(scope)[name]
+
+    def update_source(
+        self,
+        source: str,
+        df: pd.DataFrame,
+        timestamp: str,
+        path: Path = None,
+        category: str = None,
+        complete: bool = True,
+    ):
+        """
+        Merges a snapshot of a single source into the index.
+        :param source: name of the scraper output.
+        :param df: dataframe of the snapshot.
+        :param timestamp: timestamp of the snapshot, as in its file name.
+        :param path: file the dataframe was read from.
+        :param category: SETTINGS.CATEGORIES name for category snapshots; None for basket snapshots.
+        :param complete: whether a category snapshot holds all pages of the category.
+        """
+        records = self.records_from_df(df=df, source=source, timestamp=timestamp)
+        with self._lock:
+            self.snapshot_files[source] = path
+            if category is None:
+                baskets = {}
+                for record in records:
+                    if record['basket_name'] is not None:
+                        baskets.setdefault(_key(record['basket_name']), []).append(record)
+                for basket_name, basket_records in baskets.items():
+                    self._merge(
+                        BASKET, basket_name, basket_records, source=source, timestamp=timestamp, complete=True
+                    )
+                    if basket_name in self.by_basket:
+                        self.basket_totals[basket_name] = sum(
+                            record['price'] for record in self.by_basket[basket_name].values()
+                        )
+                    else:
+                        self.basket_totals.pop(basket_name, None)
+            else:
+                # Category pages name their basket after the Ceneo title; SETTINGS name is used instead.
+                for record in records:
+                    record['category'] = category
+                    record['basket_name'] = None
+                self._merge(CATEGORY, category, records, source=source, timestamp=timestamp, complete=complete)
+                # Cheapest-first lists are rebuilt lazily, only for the categories that changed.
+                self._cheapest.pop(category, None)
+                self._cheapest.pop(None, None)
+
+    def basket(self, basket_name: str) -> Optional[Dict]:
+        with self._lock:
+            if basket_name not in self.by_basket:
+                return None
+            return {
+                'basket_name': basket_name,
+                'total_price': self.basket_totals[basket_name],
+                'products': list(self.by_basket[basket_name].values()),
+            }
+
+    def part(self, part_id) -> List[Dict]:
+        with self._lock:
+            records = list(self.by_part.get(_key(part_id), {}).values())
+        return sorted(records, key=lambda record: record['price'])
+
+    def category(self, category: str) -> List[Dict]:
+        with self._lock:
+            return list(self.by_category.get(category, {}).values())
+
+    def shop(self, shop_name: str) -> List[Dict]:
+        with self._lock:
+            return list(self.by_shop.get(shop_name, {}).values())
+
+    def cheapest(self, n: int = 10, category: str = None) -> List[Dict]:
+        """
+        Returns `n` cheapest offers of scraped categories, optionally within a single category.
+        """
+        with self._lock:
+            if category not in self._cheapest:
+                if category is None:
+                    records = [record for records in self.by_category.values() for record in records.values()]
+                else:
+                    records = self.category(category)
+                self._cheapest[category] = sorted(records, key=lambda record: record['price'])
+            return self._cheapest[category][:n]
+
+    def summary(self) -> Dict:
+        with self._lock:
+            return {
+                'sources': {source: str(path) for source, path in self.snapshot_files.items()},
+                'baskets': dict(self.basket_totals),
+                'categories': sorted(self.by_category),
+                'shops': sorted(self.by_shop),
+                'n_records': sum(len(records) for records in self.by_basket.values())
+                + sum(len(records) for records in self.by_category.values()),
+            }
+
+
+class SnapshotWatcher:
+    """
+    Keeps a PriceIndex in sync with scraper output folders by loading the newest pickle of every source once it
+    appears.
+    """
+
+    def __init__(
+        self,
+        index: PriceIndex,
+        basket_folders: List[Path],
+        category_folders: List[Path],
+        poll_interval: float = 5.0,
+    ):
+        self.index = index
+        self.basket_folders = [Path(folder) for folder in basket_folders]
+        self.category_folders = [Path(folder) for folder in category_folders]
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self) -> List[str]:
+        """
+        Loads snapshots newer than the ones already indexed.
+        :return: names of updated sources.
+        """
+        updated = []
+        for folders, is_category in ((self.basket_folders, False), (self.category_folders, True)):
+            for source, (timestamp, path) in sorted(find_latest_snapshots(folders).items()):
+                if self.index.snapshot_files.get(source) == path:
+                    continue
+                try:
+                    df = pd.read_pickle(path)
+                except Exception as e:
+                    # The file may still be being written; it's picked up on the next poll.
+                    logger.warning(f"{path} could not be loaded: {e}")
+                    continue
+                category, complete = None, True
+                if is_category:
+                    # Category snapshots are saved under their SETTINGS.CATEGORIES name.
+                    category = source.split('/', 1)[1]
+                    match = CATEGORY_PAGE_SOURCE.match(category)
+                    if match:
+                        category, complete = match['category'], False
+                self.index.update_source(
+                    source=source, df=df, timestamp=timestamp, path=path, category=category, complete=complete
+                )
+                updated.append(source)
+                logger.info(f"{source} updated from {path.name}.")
+        return updated
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Snapshot refresh failed.")
+
+    def start(self):
+        self.refresh()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
@@ -0,0 +1,102 @@
+import json
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+from urllib.parse import parse_qs, unquote, urlparse
+
+from model.modules.price_index import PriceIndex, SnapshotWatcher
+
+logger = logging.getLogger(__name__)
+
+
+class PriceRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON endpoints over the PriceIndex of the server:
+        /baskets/<basket_name>        products of a basket and its total price
+        /parts/<part_id>              offers of a part, cheapest first
+        /categories/<category>        offers within a category, by its SETTINGS.CATEGORIES name
+        /shops/<shop_name>            offers of a shop
+        /cheapest?n=10&category=<c>   n cheapest offers of scraped categories, optionally within one
+        /status                       indexed sources, baskets, categories and shops
+    """
+
+    def _send_json(self, data, status: int = 200):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        index = self.server.index
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = [unquote(part) for part in url.path.strip('/').split('/')]
+        route, key = parts[0], '/'.join(parts[1:])
+
+        if route == 'baskets' and key:
+            result = index.basket(key)
+        elif route == 'parts' and key:
+            result = index.part(key)
+        elif route == 'categories' and key:
+            result = index.category(key)
+        elif route == 'shops' and key:
+            result = index.shop(key)
+        elif route == 'cheapest':
+            try:
+                n = int(query.get('n', ['10'])[0])
+            except ValueError:
+                n = 0
+            if n < 1:
+                return self._send_json({'error': "Parameter n has to be a positive integer."}, status=400)
+            result = index.cheapest(n=n, category=query.get('category', [None])[0])
+        elif route == 'status':
+            result = index.summary()
+        else:
+            return self._send_json({'error': f"Unknown endpoint: {url.path}."}, status=404)
+
+        if not result:
+            return self._send_json({'error': f"Nothing found at {url.path}."}, status=404)
+        self._send_json(result)
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+class PriceService:
+    """
+    Local HTTP/JSON service answering price queries from the latest scraper results kept in memory.
+    """
+
+    def __init__(
+        self,
+        basket_folders: List[Path],
+        category_folders: List[Path],
+        host: str = '127.0.0.1',
+        port: int = 8000,
+        poll_interval: float = 5.0,
+    ):
+        self.index = PriceIndex()
+        self.watcher = SnapshotWatcher(
+            index=self.index,
+            basket_folders=basket_folders,
+            category_folders=category_folders,
+            poll_interval=poll_interval,
+        )
+        self.server = ThreadingHTTPServer((host, port), PriceRequestHandler)
+        self.server.index = self.index
+
+    def run(self):
+        self.watcher.start()
+        host, port = self.server.server_address[:2]
+        logger.info(f"Serving prices of {len(self.index.snapshot_files)} sources at http://{host}:{port}.")
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.watcher.stop()
+
+    def shutdown(self):
+        self.server.shutdown()
@@ -2,13 +2,14 @@ import logging
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import List, Union, Dict
+from typing import Callable, List, Union, Dict
 import concurrent.futures
 
 import pandas as pd
 from tqdm.autonotebook import tqdm
 from model.modules.page_readers import CategoryReader, ProductSetReader, ProductPageReader
 from model.modules.baskets import Basket
+from model.modules.snapshots import basket_output_name
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,7 @@ class BaseScraper:
         else:
             filename = f"{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}.pkl"
         self.df.to_pickle(path / filename)
+        return path / filename
 
 
 class MultipleBasketsScraper(BaseScraper):
@@ -53,12 +55,20 @@ class MultipleBasketsScraper(BaseScraper):
         self.save_result_df()
 
 class BasketScraper(BaseScraper):
-    def __init__(self, basket_name: str, product_urls: List):
-        super().__init__()
+    def __init__(
+        self,
+        basket_name: str,
+        product_urls: List,
+        output_folder: Path = Path.cwd(),
+        rate_limit: Callable[[], None] = None,
+    ):
+        super().__init__(output_name=basket_output_name(basket_name), output_folder=output_folder)
         self.product_urls = product_urls
         self.basket = Basket(name=basket_name)
         self.timestamp = None
         self.status = 'not scraped'
+        # Called before every product page request, e.g. to respect a rate limit shared between workers.
+        self.rate_limit = rate_limit
 
     def _status_check(self):
         if len(self.basket.df) == len(self.product_urls):
@@ -73,6 +83,8 @@ class BasketScraper(BaseScraper):
 
     def scrape_product(self, url):
         reader = ProductPageReader(url=url)
+        if self.rate_limit:
+            self.rate_limit()
         reader.read()
         return reader.product
 
@@ -127,8 +139,10 @@ class CategoryScraper(BaseScraper):
 
 
 class ProductSetScraper(BaseScraper):
-    def __init__(self, ceneo_summaries: Union[str, List], output_folder: Path = Path.cwd()):
-        super().__init__(output_name='product_set', output_folder=output_folder)
+    def __init__(
+        self, ceneo_summaries: Union[str, List], output_folder: Path = Path.cwd(), output_name: str = 'product_set'
+    ):
+        super().__init__(output_name=output_name, output_folder=output_folder)
         self.ceneo_summaries = ceneo_summaries
         self.dfs = []
 
@@ -0,0 +1,36 @@
+import re
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Scrapers save results as `<output_name>_%Y_%m_%d_%H_%M_%S.pkl`, or just the timestamp without an output name.
+SNAPSHOT_FILENAME = re.compile(r"^(?:(?P<source>.+)_)?(?P<timestamp>\d{4}_\d{2}_\d{2}_\d{2}_\d{2}_\d{2})$")
+
+
+def basket_output_name(basket_name: str) -> str:
+    """
+    Output name of a single basket's result, kept apart from the `product_set` holding every basket.
+    """
+    return f"basket_{basket_name}"
+
+
+def find_latest_snapshots(folders: List[Path]) -> Dict[str, Tuple[str, Path]]:
+    """
+    Finds the newest result file of every scraper output in given folders. Only file names are read, so this is cheap
+    enough to call on every poll.
+    :param folders: scraper output folders.
+    :return: lookup between source names (`<folder>/<output_name>`) and their newest (timestamp, path).
+    """
+    latest = {}
+    for folder in folders:
+        folder = Path(folder)
+        if not folder.is_dir():
+            continue
+        for path in folder.glob("*.pkl"):
+            match = SNAPSHOT_FILENAME.match(path.stem)
+            if not match:
+                continue
+            source = f"{folder.name}/{match['source'] or folder.name}"
+            # Timestamps in file names are zero-padded, so they sort as strings.
+            if source not in latest or match['timestamp'] > latest[source][0]:
+                latest[source] = (match['timestamp'], path)
+    return latest
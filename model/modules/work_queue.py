@@ -0,0 +1,443 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+BASKET_TASK = 'basket'
+CATEGORY_PAGE_TASK = 'category_page'
+# Category pagination in CategoryReader.generate_category_urls is only known for graphic cards; pages 2..n of any
+# other category would be graphic cards pages labelled with the wrong category.
+PAGINATED_CATEGORIES = ['graphic_cards']
+COUNTS_QUERY = "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+
+
+def queue_path_from_settings(settings) -> Path:
+    """
+    Returns SETTINGS.QUEUE_PATH, or `queue.sqlite` in the working directory when it isn't set.
+    """
+    return Path(getattr(settings, 'QUEUE_PATH', Path.cwd() / 'queue.sqlite'))
+
+
+def read_queue_counts(path: Path) -> Dict[str, int]:
+    """
+    Counts tasks per status in a SQLiteQueue file opened read-only, so that a status check neither creates the schema
+    nor waits for the write lock held by busy workers.
+    """
+    conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        return dict(conn.execute(COUNTS_QUERY).fetchall())
+    except sqlite3.OperationalError:
+        # No tasks table yet.
+        return {}
+    finally:
+        conn.close()
+
+
+class Task:
+    def __init__(self, task_id: int, kind: str, payload: Dict, attempts: int, lease_owner: str = None):
+        self.task_id = task_id
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+        self.lease_owner = lease_owner
+
+    def __repr__(self):
+        return repr(f"{self.kind} #{self.task_id} / attempt {self.attempts}")
+
+
+class BaseQueue:
+    """
+    Interface of a work queue shared by a coordinator and any number of workers. Tasks are claimed under a lease; a
+    task whose lease runs out (e.g. its worker died) is handed out again until it runs out of attempts.
+    """
+
+    def enqueue(self, kind: str, payload: Dict, max_attempts: int = 3, dedup_key: str = None) -> int:
+        raise NotImplementedError
+
+    def claim(self, owner: str, lease_seconds: float) -> Optional[Task]:
+        raise NotImplementedError
+
+    def extend_lease(self, task: Task, lease_seconds: float) -> bool:
+        raise NotImplementedError
+
+    def complete(self, task: Task, result: str = None) -> bool:
+        raise NotImplementedError
+
+    def fail(self, task: Task, error: str) -> bool:
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def is_drained(self) -> bool:
+        counts = self.counts()
+        return counts.get('pending', 0) == 0 and counts.get('leased', 0) == 0
+
+    def acquire_rate_limit(self, n_requests: int, requests_per_second: float):
+        raise NotImplementedError
+
+
+class SQLiteQueue(BaseQueue):
+    """
+    Work queue stored in a single SQLite file; every worker process opens its own connection to the same file. The
+    global rate limit is kept in the same file.
+
+    Only for workers running on the same host as the file: SQLite's locking, which alone keeps two workers from
+    claiming the same task, is unreliable on network drives (NFS/SMB). Workers on several hosts need a BaseQueue
+    backed by a server.
+    """
+
+    def __init__(self, path: Path, timeout: float = 30.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL DEFAULT 3,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    result TEXT,
+                    error TEXT,
+                    dedup_key TEXT,
+                    updated REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires)")
+            conn.execute("CREATE INDEX IF NOT EXISTS tasks_dedup_key ON tasks (dedup_key, status)")
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_limit (name TEXT PRIMARY KEY, next_slot REAL NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared between threads, hence one connection per thread.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._connection())
+
+    def enqueue(self, kind: str, payload: Dict, max_attempts: int = 3, dedup_key: str = None) -> int:
+        """
+        Adds a task to the queue.
+        :param dedup_key: if a pending or leased task with the same key exists, no new task is added and its id is
+        returned instead; lets the coordinator be re-run while the previous run is still being worked on.
+        :return: id of the task.
+        """
+        with self._transaction() as conn:
+            if dedup_key is not None:
+                row = conn.execute(
+                    "SELECT task_id FROM tasks WHERE dedup_key = ? AND status IN ('pending', 'leased')",
+                    (dedup_key,),
+                ).fetchone()
+                if row:
+                    return row[0]
+            cursor = conn.execute(
+                "INSERT INTO tasks (kind, payload, max_attempts, dedup_key, updated) VALUES (?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload), max_attempts, dedup_key, time.time()),
+            )
+            return cursor.lastrowid
+
+    def claim(self, owner: str, lease_seconds: float) -> Optional[Task]:
+        """
+        Claims the oldest available task: either a pending one or one whose lease has expired.
+        :param owner: worker identifier stored with the lease.
+        :param lease_seconds: how long the task stays with the worker without extending the lease.
+        :return: claimed task or None if nothing is available right now.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # Expired leases which already used up all attempts will never be retried.
+            conn.execute(
+                """
+                UPDATE tasks SET status = 'failed', error = 'lease expired', lease_owner = NULL, updated = ?
+                WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts
+                """,
+                (now, now),
+            )
+            row = conn.execute(
+                """
+                SELECT task_id, kind, payload, attempts FROM tasks
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY task_id LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            task_id, kind, payload, attempts = row
+            conn.execute(
+                """
+                UPDATE tasks SET status = 'leased', attempts = attempts + 1, lease_owner = ?, lease_expires = ?,
+                updated = ? WHERE task_id = ?
+                """,
+                (owner, now + lease_seconds, now, task_id),
+            )
+        return Task(task_id=task_id, kind=kind, payload=json.loads(payload), attempts=attempts + 1, lease_owner=owner)
+
+    def extend_lease(self, task: Task, lease_seconds: float) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE tasks SET lease_expires = ?, updated = ?
+                WHERE task_id = ? AND status = 'leased' AND lease_owner = ? AND attempts = ?
+                """,
+                (now + lease_seconds, now, task.task_id, task.lease_owner, task.attempts),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, task: Task, result: str = None) -> bool:
+        """
+        Marks a task as done; ignored when the task has been claimed again since, i.e. the lease was lost.
+        :return: whether the task was marked.
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE tasks SET status = 'done', result = ?, lease_owner = NULL, lease_expires = NULL, updated = ?
+                WHERE task_id = ? AND status = 'leased' AND lease_owner = ? AND attempts = ?
+                """,
+                (result, time.time(), task.task_id, task.lease_owner, task.attempts),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, task: Task, error: str) -> bool:
+        """
+        Gives a failed task back to the queue, or marks it as failed once it has used up all of its attempts. Ignored
+        when the task has been claimed again since.
+        :return: whether the task was marked.
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE tasks SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+                error = ?, lease_owner = NULL, lease_expires = NULL, updated = ?
+                WHERE task_id = ? AND status = 'leased' AND lease_owner = ? AND attempts = ?
+                """,
+                (error, time.time(), task.task_id, task.lease_owner, task.attempts),
+            )
+            return cursor.rowcount == 1
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._connection().execute(COUNTS_QUERY).fetchall()
+        return dict(rows)
+
+    def acquire_rate_limit(self, n_requests: int, requests_per_second: float):
+        """
+        Blocks until `n_requests` requests may be sent without exceeding the limit shared by all workers. Each caller
+        books the next free slots in the queue file and sleeps until its slot comes, so call it right before every
+        request rather than once for a batch of them.
+        :param n_requests: number of HTTP requests the caller is about to send.
+        :param requests_per_second: global limit; 0 or None disables limiting.
+        """
+        if not requests_per_second or n_requests <= 0:
+            return
+        interval = n_requests / requests_per_second
+        with self._transaction() as conn:
+            now = time.time()
+            row = conn.execute("SELECT next_slot FROM rate_limit WHERE name = 'global'").fetchone()
+            slot = max(now, row[0]) if row else now
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit (name, next_slot) VALUES ('global', ?)",
+                (slot + interval,),
+            )
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class _ImmediateTransaction:
+    """
+    Context manager taking SQLite's write lock up front, so concurrent claims cannot hand out the same task.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
+
+
+class Coordinator:
+    """
+    Splits the scraping work into basket and category page tasks and puts them on the queue. Tasks still pending or
+    leased from a previous run are not enqueued again, so the coordinator can be run from cron.
+    """
+
+    def __init__(self, queue: BaseQueue, requests_per_second: float = None, max_attempts: int = 3):
+        self.queue = queue
+        self.requests_per_second = requests_per_second
+        self.max_attempts = max_attempts
+
+    def enqueue_baskets(self, baskets_lookup: Dict, output_folder: Path) -> List[int]:
+        return [
+            self.queue.enqueue(
+                BASKET_TASK,
+                {'basket_name': basket_name, 'product_urls': product_urls, 'output_folder': str(output_folder)},
+                max_attempts=self.max_attempts,
+                dedup_key=f"{BASKET_TASK}:{basket_name}",
+            )
+            for basket_name, product_urls in baskets_lookup.items()
+        ]
+
+    def enqueue_category(self, url: str, category_name: str, output_folder: Path) -> List[int]:
+        """
+        Reads the main category page to find the number of its pages and enqueues every page as a separate task.
+        """
+        if category_name not in PAGINATED_CATEGORIES:
+            raise ValueError(f"Pagination of {category_name} category is unknown; supported: {PAGINATED_CATEGORIES}.")
+        # Readers pull in bs4, pandas and validators; they are imported only once there is something to scrape.
+        from model.modules.page_readers import CategoryReader
+
+        self.queue.acquire_rate_limit(1, self.requests_per_second)
+        reader = CategoryReader(url=url)
+        main_page = reader.parse_page(url=url)
+        title = reader.get_title(page=main_page)
+        n_category_pages = reader.find_n_total_pages(page=main_page)
+        category_urls = reader.generate_category_urls(base_url=url, n_category_pages=n_category_pages)
+        return [
+            self.queue.enqueue(
+                CATEGORY_PAGE_TASK,
+                {
+                    'url': page_url,
+                    'page_number': page_number,
+                    'category_name': category_name,
+                    'title': title,
+                    'output_folder': str(output_folder),
+                },
+                max_attempts=self.max_attempts,
+                dedup_key=f"{CATEGORY_PAGE_TASK}:{category_name}:{page_number}",
+            )
+            for page_number, page_url in enumerate(category_urls)
+        ]
+
+
+class Worker:
+    """
+    Claims tasks from the queue, executes them with the existing readers and scrapers and saves each result to its
+    own pickle in the task's output folder.
+    """
+
+    def __init__(
+        self,
+        queue: BaseQueue,
+        name: str = None,
+        lease_seconds: float = 300.0,
+        poll_interval: float = 1.0,
+        requests_per_second: float = None,
+    ):
+        self.queue = queue
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.requests_per_second = requests_per_second
+        self.n_done = 0
+        self.n_failed = 0
+
+    def run_basket_task(self, payload: Dict) -> Path:
+        from model.modules.scrapers import BasketScraper
+
+        basket_scraper = BasketScraper(
+            basket_name=payload['basket_name'],
+            product_urls=payload['product_urls'],
+            output_folder=payload['output_folder'],
+            rate_limit=lambda: self.queue.acquire_rate_limit(1, self.requests_per_second),
+        )
+        basket_scraper.run()
+        return basket_scraper.save_result_df()
+
+    def run_category_page_task(self, payload: Dict) -> Path:
+        from model.modules.page_readers import CategoryReader
+
+        self.queue.acquire_rate_limit(1, self.requests_per_second)
+        df = CategoryReader(url=payload['url']).read_page(url=payload['url'], title=payload['title'])
+        return self.save_result_df(
+            df=df,
+            output_name=f"{payload['category_name']}_page_{payload['page_number']}",
+            output_folder=payload['output_folder'],
+        )
+
+    def save_result_df(self, df: 'pd.DataFrame', output_name: str, output_folder: str) -> Path:
+        from model.modules.scrapers import BaseScraper
+
+        scraper = BaseScraper(output_name=output_name, output_folder=output_folder)
+        scraper.df = df
+        return scraper.save_result_df()
+
+    def execute(self, task: Task) -> Path:
+        if task.kind == BASKET_TASK:
+            return self.run_basket_task(task.payload)
+        elif task.kind == CATEGORY_PAGE_TASK:
+            return self.run_category_page_task(task.payload)
+        raise ValueError(f"Unknown task kind: {task.kind}.")
+
+    def _keep_lease(self, task: Task, stop: threading.Event):
+        # Renews the lease while the task is running; a dead worker stops renewing and its task becomes claimable.
+        while not stop.wait(self.lease_seconds / 3):
+            if not self.queue.extend_lease(task, self.lease_seconds):
+                logger.warning(f"{self.name} lost the lease on {task}.")
+                return
+
+    def run_task(self, task: Task):
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._keep_lease, args=(task, stop), daemon=True)
+        heartbeat.start()
+        try:
+            path = self.execute(task)
+        except Exception:
+            logger.critical(f"{task} failed on {self.name}. \n---TRACEBACK---\n")
+            traceback.print_exc()
+            self.queue.fail(task, error=traceback.format_exc())
+            self.n_failed += 1
+        else:
+            if not self.queue.complete(task, result=str(path)):
+                logger.warning(f"{self.name} finished {task} after losing its lease.")
+            self.n_done += 1
+        finally:
+            stop.set()
+            heartbeat.join()
+
+    def run(self, exit_when_drained: bool = True):
+        """
+        Main loop; claims and executes tasks until the queue is drained.
+        :param exit_when_drained: keep polling an empty queue when False.
+        """
+        logger.info(f"Worker {self.name} started.")
+        while True:
+            task = self.queue.claim(owner=self.name, lease_seconds=self.lease_seconds)
+            if task is None:
+                if exit_when_drained and self.queue.is_drained():
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            logger.debug(f"{self.name} claimed {task}.")
+            self.run_task(task)
+        logger.info(f"Worker {self.name} finished; {self.n_done} tasks done, {self.n_failed} failed.")
@@ -0,0 +1,33 @@
+import argparse
+import warnings
+
+import SETTINGS
+from model.modules.price_service import PriceService
+
+warnings.filterwarnings("ignore")
+import logging.config
+
+# Logger settings.
+logging.config.dictConfig(SETTINGS.LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+def run(host: str = '127.0.0.1', port: int = 8000, poll_interval: float = 5.0):
+    service = PriceService(
+        basket_folders=[SETTINGS.PRODUCT_SET_OUTPUT_FOLDER],
+        category_folders=[SETTINGS.CATEGORIES_OUTPUT_FOLDER],
+        host=host,
+        port=port,
+        poll_interval=poll_interval,
+    )
+    service.run()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the latest Ceneo prices over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--poll-interval', type=float, default=5.0, help="seconds between output folder checks")
+    args = parser.parse_args()
+
+    run(host=args.host, port=args.port, poll_interval=args.poll_interval)
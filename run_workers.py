@@ -0,0 +1,68 @@
+import argparse
+import multiprocessing
+import warnings
+from pathlib import Path
+
+import SETTINGS
+from model.modules.work_queue import PAGINATED_CATEGORIES, Coordinator, SQLiteQueue, Worker, queue_path_from_settings
+
+warnings.filterwarnings("ignore")
+import logging.config
+
+# Logger settings.
+logging.config.dictConfig(SETTINGS.LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+# Queue settings; the queue file has to be on a local drive of the host running the workers.
+QUEUE_PATH = queue_path_from_settings(SETTINGS)
+REQUESTS_PER_SECOND = getattr(SETTINGS, 'REQUESTS_PER_SECOND', 5.0)
+
+
+def coordinate(queue_path: Path = QUEUE_PATH):
+    queue = SQLiteQueue(path=queue_path)
+    coordinator = Coordinator(queue=queue, requests_per_second=REQUESTS_PER_SECOND)
+
+    basket_tasks = coordinator.enqueue_baskets(
+        baskets_lookup=SETTINGS.BASKETS_LOOKUP, output_folder=SETTINGS.PRODUCT_SET_OUTPUT_FOLDER
+    )
+    logger.info(f"Enqueued {len(basket_tasks)} basket tasks.")
+
+    for category_name, url in SETTINGS.CATEGORIES.items():
+        if category_name not in PAGINATED_CATEGORIES:
+            logger.warning(f"Skipping {category_name} category; its pagination is unknown.")
+            continue
+        category_tasks = coordinator.enqueue_category(
+            url=url, category_name=category_name, output_folder=SETTINGS.CATEGORIES_OUTPUT_FOLDER
+        )
+        logger.info(f"Enqueued {len(category_tasks)} page tasks of {category_name} category.")
+
+
+def work(queue_path: Path = QUEUE_PATH, exit_when_drained: bool = True):
+    # Every process opens its own connection to the queue file.
+    worker = Worker(queue=SQLiteQueue(path=queue_path), requests_per_second=REQUESTS_PER_SECOND)
+    worker.run(exit_when_drained=exit_when_drained)
+
+
+def run(processes: int = 1, queue_path: Path = QUEUE_PATH, exit_when_drained: bool = True):
+    workers = [
+        multiprocessing.Process(target=work, args=(queue_path, exit_when_drained)) for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    logger.info(f"Queue status: {SQLiteQueue(path=queue_path).counts()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Queue-based scraping of Ceneo baskets and categories.")
+    parser.add_argument('mode', choices=['coordinate', 'work'])
+    parser.add_argument('--processes', type=int, default=1, help="number of worker processes on this host")
+    parser.add_argument('--queue', type=Path, default=QUEUE_PATH, help="path to the SQLite queue file")
+    parser.add_argument('--keep-polling', action='store_true', help="don't exit when the queue is drained")
+    args = parser.parse_args()
+
+    if args.mode == 'coordinate':
+        coordinate(queue_path=args.queue)
+    else:
+        run(processes=args.processes, queue_path=args.queue, exit_when_drained=not args.keep_polling)
@@ -0,0 +1,124 @@
+import sys
+import types
+
+import pytest
+
+from model import cli
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    settings = types.ModuleType('SETTINGS')
+    settings.BASKETS_LOOKUP = {'a': ['https://www.ceneo.pl/1', 'https://www.ceneo.pl/2'], 'b': ['https://www.ceneo.pl/3']}
+    settings.CATEGORIES = {
+        'graphic_cards': 'https://www.ceneo.pl/Karty_graficzne',
+        'processors': 'https://www.ceneo.pl/Procesory',
+    }
+    settings.PRODUCT_SET_OUTPUT_FOLDER = tmp_path / 'product_set'
+    settings.CATEGORIES_OUTPUT_FOLDER = tmp_path / 'categories'
+    settings.LOGGING_CONFIG = {'version': 1}
+    settings.QUEUE_PATH = tmp_path / 'queue.sqlite'
+    monkeypatch.setitem(sys.modules, 'SETTINGS', settings)
+    return settings
+
+
+def test_scoped_basket_run_is_saved_per_basket(settings, capsys):
+    cli.main(['--dry-run', 'basket', 'a'])
+
+    assert capsys.readouterr().out.strip() == f"basket a: 2 product pages -> {settings.PRODUCT_SET_OUTPUT_FOLDER}/basket_a"
+
+
+def test_full_basket_run_is_saved_as_product_set(settings, capsys):
+    cli.main(['--dry-run', 'basket', '--all'])
+
+    assert capsys.readouterr().out.splitlines() == [
+        f"basket a: 2 product pages -> {settings.PRODUCT_SET_OUTPUT_FOLDER}/product_set",
+        f"basket b: 1 product pages -> {settings.PRODUCT_SET_OUTPUT_FOLDER}/product_set",
+    ]
+
+
+def test_summary_run_is_not_saved_as_product_set(settings, capsys):
+    cli.main(['--dry-run', 'summary', 'https://www.ceneo.pl/summary'])
+
+    assert capsys.readouterr().out.strip().endswith('/summary')
+
+
+def test_unknown_basket(settings):
+    with pytest.raises(SystemExit, match="Unknown basket: c"):
+        cli.main(['--dry-run', 'basket', 'c'])
+
+
+@pytest.mark.parametrize('argv', [['--dry-run', 'all'], ['all', '--dry-run']])
+def test_dry_run_before_or_after_command(settings, capsys, argv):
+    cli.main(argv)
+
+    assert capsys.readouterr().out.splitlines() == [
+        f"basket a: 2 product pages -> {settings.PRODUCT_SET_OUTPUT_FOLDER}/product_set",
+        f"basket b: 1 product pages -> {settings.PRODUCT_SET_OUTPUT_FOLDER}/product_set",
+        f"category graphic_cards: https://www.ceneo.pl/Karty_graficzne -> {settings.CATEGORIES_OUTPUT_FOLDER}",
+    ]
+
+
+def test_dry_run_is_off_by_default():
+    assert cli.make_parser().parse_args(['category', 'graphic_cards']).dry_run is False
+
+
+def test_status_reports_queue(settings, capsys):
+    from model.modules.work_queue import SQLiteQueue
+
+    SQLiteQueue(path=settings.QUEUE_PATH).enqueue('basket', {})
+    cli.main(['status'])
+
+    assert f"queue {settings.QUEUE_PATH}: 1 pending" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('argv', [['category', 'processors'], ['all', '--categories', 'graphic_cards', 'processors']])
+def test_category_without_known_pagination_is_rejected(settings, capsys, argv):
+    with pytest.raises(SystemExit, match="Pagination of processors category is unknown"):
+        cli.main(argv + ['--dry-run'])
+
+    assert capsys.readouterr().out == ''
+
+
+@pytest.fixture
+def fake_product_pages(monkeypatch):
+    from model.modules.page_readers import ProductPageReader
+    from model.modules.parts import Product
+
+    def read(reader):
+        reader.product = Product(name=reader.url, price='100', product_id=reader.url.split('/')[-1].split(';')[0])
+
+    monkeypatch.setattr(ProductPageReader, 'read', read)
+
+
+def test_scoped_basket_run_saves_basket_pickle(settings, capsys, fake_product_pages):
+    cli.main(['basket', 'a', '--dry-run'])
+    announced = capsys.readouterr().out.strip().rsplit('/', 1)[1]
+    cli.main(['basket', 'a'])
+
+    [saved] = settings.PRODUCT_SET_OUTPUT_FOLDER.glob('*.pkl')
+    assert saved.name.startswith(f"{announced}_")
+    assert announced == 'basket_a'
+
+
+def test_full_basket_run_saves_product_set_pickle(settings, fake_product_pages):
+    cli.main(['basket', '--all'])
+
+    [saved] = settings.PRODUCT_SET_OUTPUT_FOLDER.glob('*.pkl')
+    assert saved.name.startswith('product_set_')
+
+
+def test_status_does_not_wait_for_busy_queue(settings, capsys):
+    import sqlite3
+
+    from model.modules.work_queue import SQLiteQueue
+
+    SQLiteQueue(path=settings.QUEUE_PATH).enqueue('basket', {})
+    worker = sqlite3.connect(settings.QUEUE_PATH, isolation_level=None, timeout=0)
+    worker.execute("BEGIN IMMEDIATE")
+    try:
+        cli.main(['status'])
+    finally:
+        worker.execute("ROLLBACK")
+
+    assert f"queue {settings.QUEUE_PATH}: 1 pending" in capsys.readouterr().out
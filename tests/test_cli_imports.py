@@ -0,0 +1,49 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ['pandas', 'bs4', 'tqdm', 'validators', 'requests']
+
+# Runs `python -m model <argv>` and reports which heavy modules ended up imported.
+# Reported at exit, so commands ending in SystemExit, like --help, are checked too.
+RUN_CLI = """
+import atexit, json, runpy, sys
+argv, heavy_modules = json.loads(sys.argv[1]), json.loads(sys.argv[2])
+atexit.register(lambda: print(json.dumps([name for name in heavy_modules if name in sys.modules])))
+sys.argv = ['model'] + argv
+runpy.run_module('model', run_name='__main__', alter_sys=True)
+"""
+
+
+@pytest.fixture
+def settings_dir(tmp_path):
+    (tmp_path / 'SETTINGS.py').write_text(
+        "from pathlib import Path\n"
+        "BASKETS_LOOKUP = {'a': ['https://www.ceneo.pl/1']}\n"
+        "CATEGORIES = {'graphic_cards': 'https://www.ceneo.pl/Karty_graficzne'}\n"
+        f"PRODUCT_SET_OUTPUT_FOLDER = Path({str(tmp_path / 'product_set')!r})\n"
+        f"CATEGORIES_OUTPUT_FOLDER = Path({str(tmp_path / 'categories')!r})\n"
+        "LOGGING_CONFIG = {'version': 1}\n"
+        f"QUEUE_PATH = Path({str(tmp_path / 'queue.sqlite')!r})\n"
+    )
+    return tmp_path
+
+
+@pytest.mark.parametrize('argv', [['--help'], ['status'], ['all', '--dry-run'], ['basket', 'a', '--dry-run']])
+def test_light_commands_skip_heavy_imports(settings_dir, argv):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([str(settings_dir), str(REPO_ROOT)]))
+    result = subprocess.run(
+        [sys.executable, '-c', RUN_CLI, json.dumps(argv), json.dumps(HEAVY_MODULES)],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.splitlines()[-1]) == []
@@ -0,0 +1,114 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from model.modules.baskets import Basket
+from model.modules.parts import Product
+from model.modules.price_index import PriceIndex, SnapshotWatcher
+
+
+def make_df(basket_name, parts):
+    basket = Basket(name=basket_name)
+    for part_id, price in parts:
+        basket.add_product(Product(name=f"part {part_id}", price=str(price), product_id=part_id, shop_name='shop.pl'))
+    basket.make_df()
+    df = basket.df
+    df['timestamp'] = datetime(2026, 10, 19)
+    return df
+
+
+def save(folder, output_name, timestamp, df):
+    folder.mkdir(parents=True, exist_ok=True)
+    df.to_pickle(folder / f"{output_name}_2026_10_19_{timestamp}.pkl")
+
+
+@pytest.fixture
+def folders(tmp_path):
+    return tmp_path / 'product_set', tmp_path / 'categories'
+
+
+def refresh(folders):
+    index = PriceIndex()
+    SnapshotWatcher(index=index, basket_folders=[folders[0]], category_folders=[folders[1]]).refresh()
+    return index
+
+
+def test_newest_basket_snapshot_replaces_older_source(folders):
+    save(folders[0], 'product_set', '01_00_00', pd.concat([make_df('a', [(1, 100), (2, 200)]), make_df('b', [(3, 50)])]))
+    save(folders[0], 'basket_a', '02_00_00', make_df('a', [(1, 110), (2, 210)]))
+
+    index = refresh(folders)
+
+    assert index.basket('a')['total_price'] == 320
+    assert len(index.basket('a')['products']) == 2
+    assert index.basket('b')['total_price'] == 50
+    assert [record['price'] for record in index.part(1)] == [110]
+
+
+def test_older_basket_snapshot_loaded_later_is_ignored(folders):
+    index = PriceIndex()
+    index.update_source('product_set/basket_a', make_df('a', [(1, 110)]), timestamp='2026_10_19_02_00_00')
+    index.update_source('product_set/product_set', make_df('a', [(1, 100), (2, 200)]), timestamp='2026_10_19_01_00_00')
+
+    assert index.basket('a')['total_price'] == 110
+    assert len(index.basket('a')['products']) == 1
+
+
+def test_category_pages_replace_parts_of_whole_category(folders):
+    save(folders[1], 'graphic_cards', '01_00_00', make_df('Karty graficzne', [(1, 1999), (2, 999)]))
+    save(folders[1], 'graphic_cards_page_0', '02_00_00', make_df('Karty graficzne', [(1, 1899)]))
+
+    index = refresh(folders)
+
+    assert sorted(record['price'] for record in index.category('graphic_cards')) == [999, 1899]
+    assert [record['price'] for record in index.cheapest(n=5)] == [999, 1899]
+    assert index.summary()['categories'] == ['graphic_cards']
+
+
+def test_newer_whole_category_drops_outdated_pages(folders):
+    save(folders[1], 'graphic_cards_page_0', '01_00_00', make_df('Karty graficzne', [(1, 1899), (4, 500)]))
+    save(folders[1], 'graphic_cards', '02_00_00', make_df('Karty graficzne', [(1, 1999), (2, 999)]))
+
+    index = refresh(folders)
+
+    assert sorted(record['part_id'] for record in index.category('graphic_cards')) == [1, 2]
+    assert index.part(4) == []
+
+
+def test_categories_are_not_baskets(folders):
+    save(folders[0], 'product_set', '01_00_00', make_df('a', [(1, 100)]))
+    save(folders[1], 'graphic_cards', '01_00_00', make_df('Karty graficzne', [(1, 1999)]))
+
+    index = refresh(folders)
+
+    assert index.basket('Karty graficzne') is None
+    assert index.summary()['baskets'] == {'a': 100}
+    assert sorted(record['price'] for record in index.part(1)) == [100, 1999]
+
+
+def test_refresh_picks_up_only_new_snapshots(folders):
+    save(folders[0], 'basket_a', '01_00_00', make_df('a', [(1, 100)]))
+    index = PriceIndex()
+    watcher = SnapshotWatcher(index=index, basket_folders=[folders[0]], category_folders=[folders[1]])
+
+    assert watcher.refresh() == ['product_set/basket_a']
+    assert watcher.refresh() == []
+
+    save(folders[0], 'basket_a', '02_00_00', make_df('a', [(1, 90)]))
+    assert watcher.refresh() == ['product_set/basket_a']
+    assert index.basket('a')['total_price'] == 90
+
+
+def test_part_which_left_a_page_is_dropped(folders):
+    save(folders[1], 'graphic_cards_page_0', '01_00_00', make_df('Karty graficzne', [(1, 500), (2, 999)]))
+    save(folders[1], 'graphic_cards_page_1', '01_00_00', make_df('Karty graficzne', [(3, 700)]))
+    index = PriceIndex()
+    watcher = SnapshotWatcher(index=index, basket_folders=[folders[0]], category_folders=[folders[1]])
+    watcher.refresh()
+
+    save(folders[1], 'graphic_cards_page_0', '02_00_00', make_df('Karty graficzne', [(2, 999)]))
+    watcher.refresh()
+
+    assert [record['part_id'] for record in index.cheapest(n=5)] == [3, 2]
+    assert index.part(1) == []
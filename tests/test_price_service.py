@@ -0,0 +1,77 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from model.modules.price_service import PriceService
+from tests.test_price_index import make_df, save
+
+
+@pytest.fixture(scope='module')
+def service(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp('price_service')
+    basket_folder, category_folder = tmp_path / 'product_set', tmp_path / 'categories'
+    save(basket_folder, 'product_set', '01_00_00', make_df('a', [(1, 100), (2, 200)]))
+    save(category_folder, 'graphic_cards', '01_00_00', make_df('Karty graficzne', [(1, 1999), (3, 999)]))
+    service = PriceService(basket_folders=[basket_folder], category_folders=[category_folder], port=0)
+    thread = threading.Thread(target=service.run, daemon=True)
+    thread.start()
+    yield service
+    service.shutdown()
+    thread.join()
+
+
+def get(service, path):
+    host, port = service.server.server_address[:2]
+    try:
+        with urllib.request.urlopen(f"http://{host}:{port}{path}") as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_basket(service):
+    status, body = get(service, '/baskets/a')
+
+    assert status == 200
+    assert body['total_price'] == 300
+    assert len(body['products']) == 2
+
+
+def test_part_is_sorted_cheapest_first(service):
+    status, body = get(service, '/parts/1')
+
+    assert status == 200
+    assert [record['price'] for record in body] == [100, 1999]
+
+
+def test_category_and_shop(service):
+    assert [record['price'] for record in get(service, '/categories/graphic_cards')[1]] == [1999, 999]
+    assert len(get(service, '/shops/shop.pl')[1]) == 4
+
+
+def test_cheapest(service):
+    status, body = get(service, '/cheapest?n=1&category=graphic_cards')
+
+    assert status == 200
+    assert [record['price'] for record in body] == [999]
+
+
+@pytest.mark.parametrize('n', ['x', '0', '-1'])
+def test_cheapest_rejects_invalid_n(service, n):
+    assert get(service, f"/cheapest?n={n}")[0] == 400
+
+
+def test_status(service):
+    status, body = get(service, '/status')
+
+    assert status == 200
+    assert body['baskets'] == {'a': 300}
+    assert body['categories'] == ['graphic_cards']
+
+
+@pytest.mark.parametrize('path', ['/nothing', '/baskets/b', '/categories/processors', '/baskets/'])
+def test_not_found(service, path):
+    assert get(service, path)[0] == 404
@@ -0,0 +1,226 @@
+import pytest
+
+from model.modules import work_queue
+from model.modules.work_queue import BASKET_TASK, Coordinator, SQLiteQueue
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(work_queue.time, 'time', clock.time)
+    monkeypatch.setattr(work_queue.time, 'sleep', clock.sleep)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return SQLiteQueue(path=tmp_path / 'queue.sqlite')
+
+
+def test_claim_returns_oldest_pending_task(queue):
+    first = queue.enqueue(BASKET_TASK, {'basket_name': 'a'})
+    queue.enqueue(BASKET_TASK, {'basket_name': 'b'})
+
+    task = queue.claim(owner='w1', lease_seconds=10)
+
+    assert task.task_id == first
+    assert task.payload == {'basket_name': 'a'}
+    assert task.attempts == 1
+    assert queue.counts() == {'leased': 1, 'pending': 1}
+
+
+def test_claim_skips_leased_task_until_lease_expires(queue, clock):
+    queue.enqueue(BASKET_TASK, {})
+    first = queue.claim(owner='w1', lease_seconds=10)
+
+    assert queue.claim(owner='w2', lease_seconds=10) is None
+
+    clock.now += 11
+    second = queue.claim(owner='w2', lease_seconds=10)
+    assert second.task_id == first.task_id
+    assert second.attempts == 2
+
+
+def test_extend_lease_keeps_task_from_other_workers(queue, clock):
+    queue.enqueue(BASKET_TASK, {})
+    task = queue.claim(owner='w1', lease_seconds=10)
+
+    clock.now += 8
+    assert queue.extend_lease(task, lease_seconds=10)
+    clock.now += 8
+    assert queue.claim(owner='w2', lease_seconds=10) is None
+
+
+def test_stale_owner_cannot_complete_or_fail_reclaimed_task(queue, clock):
+    queue.enqueue(BASKET_TASK, {})
+    stale = queue.claim(owner='w1', lease_seconds=10)
+    clock.now += 11
+    current = queue.claim(owner='w1', lease_seconds=10)
+
+    assert not queue.complete(stale, result='stale')
+    assert not queue.fail(stale, error='stale')
+    assert not queue.extend_lease(stale, lease_seconds=10)
+    assert queue.counts() == {'leased': 1}
+
+    assert queue.complete(current, result='ok')
+    assert queue.counts() == {'done': 1}
+    assert queue.is_drained()
+
+
+def test_failed_task_is_retried_until_max_attempts(queue):
+    queue.enqueue(BASKET_TASK, {}, max_attempts=2)
+
+    assert queue.fail(queue.claim(owner='w1', lease_seconds=10), error='boom')
+    assert queue.counts() == {'pending': 1}
+    assert queue.fail(queue.claim(owner='w1', lease_seconds=10), error='boom')
+    assert queue.counts() == {'failed': 1}
+    assert queue.claim(owner='w1', lease_seconds=10) is None
+
+
+def test_expired_lease_on_last_attempt_fails_task(queue, clock):
+    queue.enqueue(BASKET_TASK, {}, max_attempts=1)
+    queue.claim(owner='w1', lease_seconds=10)
+
+    clock.now += 11
+    assert queue.claim(owner='w2', lease_seconds=10) is None
+    assert queue.counts() == {'failed': 1}
+
+
+def test_enqueue_deduplicates_active_tasks_only(queue):
+    first = queue.enqueue(BASKET_TASK, {}, dedup_key='basket:a')
+    assert queue.enqueue(BASKET_TASK, {}, dedup_key='basket:a') == first
+
+    queue.complete(queue.claim(owner='w1', lease_seconds=10))
+    assert queue.enqueue(BASKET_TASK, {}, dedup_key='basket:a') != first
+
+
+def test_coordinator_can_be_rerun(queue, tmp_path):
+    coordinator = Coordinator(queue=queue)
+    baskets_lookup = {'a': ['https://www.ceneo.pl/1'], 'b': ['https://www.ceneo.pl/2']}
+
+    first = coordinator.enqueue_baskets(baskets_lookup=baskets_lookup, output_folder=tmp_path)
+    second = coordinator.enqueue_baskets(baskets_lookup=baskets_lookup, output_folder=tmp_path)
+
+    assert first == second
+    assert queue.counts() == {'pending': 2}
+
+
+def test_coordinator_rejects_category_without_known_pagination(queue, tmp_path):
+    with pytest.raises(ValueError):
+        Coordinator(queue=queue).enqueue_category(
+            url='https://www.ceneo.pl/Procesory', category_name='processors', output_folder=tmp_path
+        )
+
+
+def test_rate_limit_books_consecutive_slots(queue, clock):
+    for _ in range(3):
+        queue.acquire_rate_limit(1, requests_per_second=2)
+
+    # First request goes out immediately, each following one waits for its own slot.
+    assert clock.sleeps == [0.5, 0.5]
+
+
+def test_rate_limit_is_shared_between_connections(queue, tmp_path, clock):
+    other = SQLiteQueue(path=tmp_path / 'queue.sqlite')
+
+    queue.acquire_rate_limit(1, requests_per_second=4)
+    other.acquire_rate_limit(1, requests_per_second=4)
+
+    assert clock.sleeps == [0.25]
+
+
+def test_rate_limit_disabled(queue, clock):
+    queue.acquire_rate_limit(5, requests_per_second=None)
+    assert clock.sleeps == []
+
+
+@pytest.fixture
+def fake_readers(monkeypatch):
+    from model.modules.page_readers import CategoryReader, ProductPageReader
+    from model.modules.parts import Product
+
+    def read_product(reader):
+        part_id = reader.url.split('/')[-1].split(';')[0]
+        reader.product = Product(name=f"part {part_id}", price='100', product_id=part_id, shop_name='shop.pl')
+
+    def read_products(reader, url):
+        return [Product(name=f"card on {url}", price='999', product_id='7')]
+
+    monkeypatch.setattr(ProductPageReader, 'read', read_product)
+    monkeypatch.setattr(CategoryReader, 'read_products', read_products)
+
+
+def test_worker_runs_basket_and_category_page_tasks(tmp_path, fake_readers):
+    import pandas as pd
+
+    queue = SQLiteQueue(path=tmp_path / 'queue.sqlite')
+    rate_limited = []
+    queue.acquire_rate_limit = lambda n_requests, requests_per_second: rate_limited.append(n_requests)
+    queue.enqueue(
+        BASKET_TASK,
+        {'basket_name': 'a', 'product_urls': ['https://www.ceneo.pl/1', 'https://www.ceneo.pl/2'],
+         'output_folder': str(tmp_path / 'product_set')},
+    )
+    queue.enqueue(
+        work_queue.CATEGORY_PAGE_TASK,
+        {'url': 'https://www.ceneo.pl/Karty_graficzne', 'page_number': 0, 'category_name': 'graphic_cards',
+         'title': 'Karty graficzne', 'output_folder': str(tmp_path / 'categories')},
+    )
+
+    worker = work_queue.Worker(queue=queue, name='w1', poll_interval=0, requests_per_second=10)
+    worker.run()
+
+    assert (worker.n_done, worker.n_failed) == (2, 0)
+    assert queue.counts() == {'done': 2}
+    # One slot per product request and one for the category page.
+    assert rate_limited == [1, 1, 1]
+    [basket_file] = (tmp_path / 'product_set').glob('*.pkl')
+    assert basket_file.name.startswith('basket_a_')
+    assert sorted(pd.read_pickle(basket_file)['price']) == [100.0, 100.0]
+    [page_file] = (tmp_path / 'categories').glob('*.pkl')
+    assert page_file.name.startswith('graphic_cards_page_0_')
+    assert list(pd.read_pickle(page_file)['basket_name']) == ['Karty graficzne']
+
+
+def test_worker_gives_failed_task_back_until_max_attempts(queue):
+    queue.enqueue('unknown', {}, max_attempts=2)
+
+    worker = work_queue.Worker(queue=queue, name='w1', poll_interval=0)
+    worker.run()
+
+    assert (worker.n_done, worker.n_failed) == (0, 2)
+    assert queue.counts() == {'failed': 1}
+
+
+def test_worker_keeps_lease_while_task_runs(tmp_path, monkeypatch):
+    queue = SQLiteQueue(path=tmp_path / 'queue.sqlite')
+    other = SQLiteQueue(path=tmp_path / 'queue.sqlite')
+    queue.enqueue(BASKET_TASK, {})
+    claimed_by_other = []
+
+    def execute(task):
+        # Runs for several lease lengths; without renewal another worker would take the task over.
+        for _ in range(4):
+            work_queue.time.sleep(0.1)
+            claimed_by_other.append(other.claim(owner='w2', lease_seconds=10))
+        return tmp_path / 'result.pkl'
+
+    worker = work_queue.Worker(queue=queue, name='w1', lease_seconds=0.15, poll_interval=0)
+    monkeypatch.setattr(worker, 'execute', execute)
+    worker.run()
+
+    assert claimed_by_other == [None] * 4
+    assert queue.counts() == {'done': 1}